@@ -124,13 +124,7 @@ class ChapterWriterAgent(dspy.Module):
             Complete chapter prose
         """
         # Prepare previous chapters context
-        prev_chapters_text = ""
-        if previous_chapters:
-            prev_chapters_text = "\n\nPrevious Chapters:\n"
-            for ch in previous_chapters:
-                prev_chapters_text += (
-                    f"Chapter {ch['chapter_number']}: {ch['summary']}\n"
-                )
+        prev_chapters_text = self._format_previous_chapters(previous_chapters)
 
         # Prepare scene expansion details
         scene_text = self._format_scene_expansion(scene_data, chapter_number)
@@ -220,13 +214,7 @@ class ChapterWriterAgent(dspy.Module):
             Chapter prose chunks
         """
         # Prepare all inputs (same as generate method)
-        prev_chapters_text = ""
-        if previous_chapters:
-            prev_chapters_text = "\n\nPrevious Chapters:\n"
-            for ch in previous_chapters:
-                prev_chapters_text += (
-                    f"Chapter {ch['chapter_number']}: {ch['summary']}\n"
-                )
+        prev_chapters_text = self._format_previous_chapters(previous_chapters)
 
         scene_text = self._format_scene_expansion(scene_data, chapter_number)
         unique_context = f"{story_context} [seed: {random.randint(1000, 9999)}]"
@@ -307,35 +295,49 @@ class ChapterWriterAgent(dspy.Module):
             if isinstance(chunk, dspy.streaming.StreamResponse):
                 yield chunk.chunk
 
+    def _format_previous_chapters(self, previous_chapters: List[Dict[str, Any]]) -> str:
+        """Format previous chapter summaries for the prompts."""
+        if not previous_chapters:
+            return ""
+        return "\n\nPrevious Chapters:\n" + "".join(
+            f"Chapter {ch['chapter_number']}: {ch['summary']}\n"
+            for ch in previous_chapters
+        )
+
     def _format_scene_expansion(
         self, scene_data: Dict[str, Any], chapter_number: int
     ) -> str:
         """Format scene expansion data into text for the prompts."""
-        scene_text = f"Chapter {chapter_number}: {scene_data.get('title', '')}\n\n"
-        scene_text += f"POV Character: {scene_data.get('pov_character', '')}\n"
-        scene_text += f"Setting: {scene_data.get('setting', '')}\n"
-        scene_text += f"Scene Goal: {scene_data.get('scene_goal', '')}\n"
-        scene_text += f"Character Goal: {scene_data.get('character_goal', '')}\n"
-        scene_text += (
-            f"Character Motivation: {scene_data.get('character_motivation', '')}\n"
-        )
+        lines = [
+            f"Chapter {chapter_number}: {scene_data.get('title', '')}",
+            "",
+            f"POV Character: {scene_data.get('pov_character', '')}",
+            f"Setting: {scene_data.get('setting', '')}",
+            f"Scene Goal: {scene_data.get('scene_goal', '')}",
+            f"Character Goal: {scene_data.get('character_goal', '')}",
+            f"Character Motivation: {scene_data.get('character_motivation', '')}",
+        ]
 
         if scene_data.get("obstacles"):
-            scene_text += "Obstacles:\n"
-            for obstacle in scene_data["obstacles"]:
-                scene_text += f"- {obstacle}\n"
+            lines.append("Obstacles:")
+            lines.extend(f"- {obstacle}" for obstacle in scene_data["obstacles"])
 
-        scene_text += f"Conflict Type: {scene_data.get('conflict_type', '')}\n"
+        lines.append(f"Conflict Type: {scene_data.get('conflict_type', '')}")
 
         if scene_data.get("key_beats"):
-            scene_text += "\nKey Story Beats:\n"
-            for beat in scene_data["key_beats"]:
-                scene_text += f"- {beat}\n"
-
-        scene_text += f"\nEmotional Arc: {scene_data.get('emotional_arc', '')}\n"
-        scene_text += f"Scene Outcome: {scene_data.get('scene_outcome', '')}\n"
+            lines.extend(("", "Key Story Beats:"))
+            lines.extend(f"- {beat}" for beat in scene_data["key_beats"])
+
+        lines.extend(
+            (
+                "",
+                f"Emotional Arc: {scene_data.get('emotional_arc', '')}",
+                f"Scene Outcome: {scene_data.get('scene_outcome', '')}",
+            )
+        )
 
-        return scene_text
+        # Join once at the end rather than growing a string per field
+        return "\n".join(lines) + "\n"
 
     def _prepare_chapter_sample(self, previous_chapter_content: str) -> str:
         """Prepare previous chapter content for style matching."""
@@ -5,6 +5,7 @@ import random
 import dspy
 from typing import List
 from pydantic import BaseModel, Field
+from .. import json_utils
 from .shared_models import ContentRefiner
 
 
@@ -89,7 +90,9 @@ class SceneBreakdownAgent(dspy.Module):
         # Ensure the result is valid JSON
         try:
             # Try to parse and re-format as JSON
-            refined_data = json.loads(result.refined_content)
+            refined_data = json_utils.loads(
+                json_utils.strip_json_fence(result.refined_content)
+            )
             return json.dumps(refined_data, indent=2)
         except json.JSONDecodeError:
             # If parsing fails, return as is
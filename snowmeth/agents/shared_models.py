@@ -4,15 +4,12 @@ import dspy
 from typing import TypeVar, Type
 from pydantic import BaseModel
 
+from ..json_utils import strip_json_fence
+
 
 def clean_json_markdown(content: str) -> str:
     """Clean up potential markdown formatting from JSON content."""
-    content = content.strip()
-    if content.startswith("```json"):
-        content = content[7:]  # Remove ```json
-    if content.endswith("```"):
-        content = content[:-3]  # Remove ```
-    return content.strip()
+    return strip_json_fence(content)
 
 
 class ContentRefiner(dspy.Signature):
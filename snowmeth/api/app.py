@@ -1,8 +1,9 @@
 """Simplified FastAPI application for Snowflake Method API."""
 
+import asyncio
 import json
 from datetime import datetime
-from typing import Dict, Any
+from typing import Any, Dict, List, Optional, Tuple
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import Response, StreamingResponse
@@ -19,9 +20,10 @@ from .models import (
 )
 from .database import db_manager
 from .sqlite_storage import AsyncSQLiteStorage
+from .. import json_utils
+from ..storage import Story
 from ..workflow import SnowflakeWorkflow
 from ..exceptions import StoryNotFoundError, StoryAlreadyExistsError
-from ..pdf_export import generate_story_pdf
 
 # Create FastAPI app
 app = FastAPI(
@@ -65,6 +67,20 @@ async def get_db() -> AsyncSession:
         yield session
 
 
+def _story_detail(story: Story, **extra: Any) -> StoryDetailResponse:
+    """Build the detail response for a story, plus any extra fields."""
+    data = story.data
+    return StoryDetailResponse(
+        story_id=story.story_id,
+        slug=story.slug,
+        story_idea=data.get("story_idea", ""),
+        current_step=story.get_current_step(),
+        created_at=data.get("created_at"),
+        steps={str(k): v for k, v in data.get("steps", {}).items()},
+        **extra,
+    )
+
+
 # Story Management Endpoints
 
 
@@ -145,13 +161,8 @@ async def get_story(story_id: str, session: AsyncSession = Depends(get_db)):
         storage = AsyncSQLiteStorage(session)
         story = await storage.load_story(story_id)
 
-        return StoryDetailResponse(
-            story_id=story.story_id,
-            slug=story.slug,
-            story_idea=story.data.get("story_idea", ""),
-            current_step=story.get_current_step(),
-            created_at=story.data.get("created_at"),
-            steps={str(k): v for k, v in story.data.get("steps", {}).items()},
+        return _story_detail(
+            story,
             chapters=story.data.get("chapters", {}),
             writing_style=story.data.get("writing_style"),
         )
@@ -201,14 +212,7 @@ async def rollback_story(
         # Save the updated story
         await storage.save_story(story)
 
-        return StoryDetailResponse(
-            story_id=story.story_id,
-            slug=story.slug,
-            story_idea=story.data.get("story_idea", ""),
-            current_step=story.get_current_step(),
-            created_at=story.data.get("created_at"),
-            steps={str(k): v for k, v in story.data.get("steps", {}).items()},
-        )
+        return _story_detail(story)
     except StoryNotFoundError:
         raise HTTPException(status_code=404, detail="Story not found")
 
@@ -258,14 +262,7 @@ async def refine_step_content(
 
         await storage.save_story(story)
 
-        return StoryDetailResponse(
-            story_id=story.story_id,
-            slug=story.slug,
-            story_idea=story.data.get("story_idea", ""),
-            current_step=story.get_current_step(),
-            created_at=story.data.get("created_at"),
-            steps={str(k): v for k, v in story.data.get("steps", {}).items()},
-        )
+        return _story_detail(story)
     except StoryNotFoundError:
         raise HTTPException(status_code=404, detail="Story not found")
 
@@ -309,14 +306,7 @@ async def generate_initial_sentence(
 
         await storage.save_story(story)
 
-        return StoryDetailResponse(
-            story_id=story.story_id,
-            slug=story.slug,
-            story_idea=story.data.get("story_idea", ""),
-            current_step=story.get_current_step(),
-            created_at=story.data.get("created_at"),
-            steps={str(k): v for k, v in story.data.get("steps", {}).items()},
-        )
+        return _story_detail(story)
     except StoryNotFoundError:
         raise HTTPException(status_code=404, detail="Story not found")
 
@@ -355,14 +345,7 @@ async def generate_paragraph_summary(
 
         await storage.save_story(story)
 
-        return StoryDetailResponse(
-            story_id=story.story_id,
-            slug=story.slug,
-            story_idea=story.data.get("story_idea", ""),
-            current_step=story.get_current_step(),
-            created_at=story.data.get("created_at"),
-            steps={str(k): v for k, v in story.data.get("steps", {}).items()},
-        )
+        return _story_detail(story)
     except StoryNotFoundError:
         raise HTTPException(status_code=404, detail="Story not found")
 
@@ -397,14 +380,7 @@ async def generate_characters(story_id: str, session: AsyncSession = Depends(get
 
         await storage.save_story(story)
 
-        return StoryDetailResponse(
-            story_id=story.story_id,
-            slug=story.slug,
-            story_idea=story.data.get("story_idea", ""),
-            current_step=story.get_current_step(),
-            created_at=story.data.get("created_at"),
-            steps={str(k): v for k, v in story.data.get("steps", {}).items()},
-        )
+        return _story_detail(story)
     except StoryNotFoundError:
         raise HTTPException(status_code=404, detail="Story not found")
 
@@ -446,14 +422,7 @@ async def generate_plot_structure(
 
         await storage.save_story(story)
 
-        return StoryDetailResponse(
-            story_id=story.story_id,
-            slug=story.slug,
-            story_idea=story.data.get("story_idea", ""),
-            current_step=story.get_current_step(),
-            created_at=story.data.get("created_at"),
-            steps={str(k): v for k, v in story.data.get("steps", {}).items()},
-        )
+        return _story_detail(story)
     except StoryNotFoundError:
         raise HTTPException(status_code=404, detail="Story not found")
 
@@ -491,14 +460,7 @@ async def generate_character_synopses(
 
         await storage.save_story(story)
 
-        return StoryDetailResponse(
-            story_id=story.story_id,
-            slug=story.slug,
-            story_idea=story.data.get("story_idea", ""),
-            current_step=story.get_current_step(),
-            created_at=story.data.get("created_at"),
-            steps={str(k): v for k, v in story.data.get("steps", {}).items()},
-        )
+        return _story_detail(story)
     except StoryNotFoundError:
         raise HTTPException(status_code=404, detail="Story not found")
 
@@ -536,14 +498,7 @@ async def generate_detailed_synopsis(
 
         await storage.save_story(story)
 
-        return StoryDetailResponse(
-            story_id=story.story_id,
-            slug=story.slug,
-            story_idea=story.data.get("story_idea", ""),
-            current_step=story.get_current_step(),
-            created_at=story.data.get("created_at"),
-            steps={str(k): v for k, v in story.data.get("steps", {}).items()},
-        )
+        return _story_detail(story)
     except StoryNotFoundError:
         raise HTTPException(status_code=404, detail="Story not found")
 
@@ -569,9 +524,14 @@ async def generate_character_charts(
 
         # Generate character charts using workflow business logic
         workflow = SnowflakeWorkflow()
-        success, character_charts, errors = workflow.handle_character_charts_generation(
-            story
-        )
+        # The charts fan out over blocking LLM calls; keep them off the event loop.
+        # The workflow and story belong to this request and aren't touched here
+        # until the thread returns.
+        (
+            success,
+            character_charts,
+            errors,
+        ) = await asyncio.to_thread(workflow.handle_character_charts_generation, story)
 
         if not success:
             error_details = "; ".join(errors) if errors else "Unknown error"
@@ -581,9 +541,7 @@ async def generate_character_charts(
             )
 
         # Convert character charts dict to JSON string for storage
-        import json
-
-        charts_json = json.dumps(character_charts, indent=2)
+        charts_json = json_utils.dumps_indented(character_charts).decode("utf-8")
 
         # Save the generated content to step 7
         story.set_step_content(7, charts_json)
@@ -595,14 +553,7 @@ async def generate_character_charts(
 
         await storage.save_story(story)
 
-        return StoryDetailResponse(
-            story_id=story.story_id,
-            slug=story.slug,
-            story_idea=story.data.get("story_idea", ""),
-            current_step=story.get_current_step(),
-            created_at=story.data.get("created_at"),
-            steps={str(k): v for k, v in story.data.get("steps", {}).items()},
-        )
+        return _story_detail(story)
     except StoryNotFoundError:
         raise HTTPException(status_code=404, detail="Story not found")
 
@@ -640,14 +591,7 @@ async def generate_scene_breakdown(
 
         await storage.save_story(story)
 
-        return StoryDetailResponse(
-            story_id=story.story_id,
-            slug=story.slug,
-            story_idea=story.data.get("story_idea", ""),
-            current_step=story.get_current_step(),
-            created_at=story.data.get("created_at"),
-            steps={str(k): v for k, v in story.data.get("steps", {}).items()},
-        )
+        return _story_detail(story)
     except StoryNotFoundError:
         raise HTTPException(status_code=404, detail="Story not found")
 
@@ -673,9 +617,14 @@ async def generate_scene_expansions(
 
         # Generate scene expansions using workflow
         workflow = SnowflakeWorkflow()
-        success, scene_expansions, errors = workflow.handle_scene_expansions_generation(
-            story
-        )
+        # Scene expansions fan out over blocking LLM calls; keep them off the loop.
+        # The workflow and story belong to this request and aren't touched here
+        # until the thread returns.
+        (
+            success,
+            scene_expansions,
+            errors,
+        ) = await asyncio.to_thread(workflow.handle_scene_expansions_generation, story)
 
         if not success:
             raise HTTPException(
@@ -684,9 +633,9 @@ async def generate_scene_expansions(
             )
 
         # Convert scene expansions dict to JSON string for storage
-        import json
-
-        scene_expansions_json = json.dumps(scene_expansions, ensure_ascii=False)
+        scene_expansions_json = json_utils.dumps_indented(scene_expansions).decode(
+            "utf-8"
+        )
 
         # Save the generated content to step 9
         story.set_step_content(9, scene_expansions_json)
@@ -698,14 +647,7 @@ async def generate_scene_expansions(
 
         await storage.save_story(story)
 
-        return StoryDetailResponse(
-            story_id=story.story_id,
-            slug=story.slug,
-            story_idea=story.data.get("story_idea", ""),
-            current_step=story.get_current_step(),
-            created_at=story.data.get("created_at"),
-            steps={str(k): v for k, v in story.data.get("steps", {}).items()},
-        )
+        return _story_detail(story)
     except StoryNotFoundError:
         raise HTTPException(status_code=404, detail="Story not found")
 
@@ -746,14 +688,7 @@ async def improve_scene(
         story.set_step_content(9, improved_content)
         await storage.save_story(story)
 
-        return StoryDetailResponse(
-            story_id=story.story_id,
-            slug=story.slug,
-            story_idea=story.data.get("story_idea", ""),
-            current_step=story.get_current_step(),
-            created_at=story.data.get("created_at"),
-            steps={str(k): v for k, v in story.data.get("steps", {}).items()},
-        )
+        return _story_detail(story)
     except StoryNotFoundError:
         raise HTTPException(status_code=404, detail="Story not found")
 
@@ -761,6 +696,9 @@ async def improve_scene(
 @app.get("/api/stories/{story_id}/export_pdf")
 async def export_story_pdf(story_id: str, session: AsyncSession = Depends(get_db)):
     """Export story as PDF document."""
+    # Imported here so fpdf is only loaded when a PDF is actually requested
+    from ..pdf_export import generate_story_pdf
+
     try:
         storage = AsyncSQLiteStorage(session)
         story = await storage.load_story(story_id)
@@ -781,6 +719,74 @@ async def export_story_pdf(story_id: str, session: AsyncSession = Depends(get_db
         raise HTTPException(status_code=404, detail="Story not found")
 
 
+def _find_scene_for_chapter(scene_expansions: Any, chapter_number: int) -> Any:
+    """Find the Step 9 scene expansion a chapter is written from."""
+    if isinstance(scene_expansions, dict):
+        # Try to find by scene number
+        for scene in scene_expansions.values():
+            if scene.get("scene_number") == chapter_number:
+                return scene
+        # If not found by scene_number, try by key
+        return scene_expansions.get(str(chapter_number))
+    if isinstance(scene_expansions, list) and chapter_number <= len(scene_expansions):
+        return scene_expansions[chapter_number - 1]
+    return None
+
+
+def _prepare_chapter_context(
+    story: Story, chapter_number: int
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Clear chapters after a regenerated one and collect previous-chapter context.
+
+    Returns the previous chapter summaries and the full content of the chapter
+    immediately before this one (for style matching), if it exists.
+    """
+    chapters_data = story.data.get("chapters", {})
+    if str(chapter_number) in chapters_data:
+        # This is a regeneration - clear all chapters after this one
+        chapters_to_remove = [
+            str(i) for i in range(chapter_number + 1, 20)
+        ]  # Assuming max 20 chapters
+        for ch_num in chapters_to_remove:
+            if ch_num in chapters_data:
+                del chapters_data[ch_num]
+        story.data["chapters"] = chapters_data
+
+    previous_chapters = []
+    previous_chapter_content = None
+
+    for i in range(1, chapter_number):
+        if str(i) in chapters_data:
+            ch_data = chapters_data[str(i)]
+            previous_chapters.append(
+                {"chapter_number": i, "summary": ch_data.get("summary", "")}
+            )
+            # Get the most recent chapter's full content for style matching
+            if i == chapter_number - 1:
+                previous_chapter_content = ch_data.get("content", "")
+
+    return previous_chapters, previous_chapter_content
+
+
+def _store_chapter(
+    story: Story, chapter_number: int, scene_data: Dict[str, Any], content: str
+) -> int:
+    """Record a newly generated chapter on the story and return its word count."""
+    word_count = len(content.split())
+
+    if "chapters" not in story.data:
+        story.data["chapters"] = {}
+
+    story.data["chapters"][str(chapter_number)] = {
+        "content": content,
+        "word_count": word_count,
+        "generated_at": datetime.now().isoformat(),
+        "scene_title": scene_data.get("title", f"Chapter {chapter_number}"),
+        "summary": f"Chapter {chapter_number}: {scene_data.get('title', '')} - {scene_data.get('scene_goal', '')[:100]}...",
+    }
+    return word_count
+
+
 @app.post("/api/stories/{story_id}/generate_chapter/stream")
 async def generate_chapter_stream(
     story_id: str, request: Dict[str, Any], session: AsyncSession = Depends(get_db)
@@ -807,26 +813,13 @@ async def generate_chapter_stream(
 
             # Parse scene expansions
             try:
-                scene_expansions = json.loads(scene_expansions_json)
+                scene_expansions = story.get_step_json(9)
             except json.JSONDecodeError:
                 yield f"data: {json.dumps({'error': 'Invalid scene expansions format'})}\n\n"
                 return
 
             # Find the scene for this chapter
-            scene_data = None
-            if isinstance(scene_expansions, dict):
-                # Try to find by scene number
-                for key, scene in scene_expansions.items():
-                    if scene.get("scene_number") == chapter_number:
-                        scene_data = scene
-                        break
-                # If not found by scene_number, try by key
-                if not scene_data:
-                    scene_data = scene_expansions.get(str(chapter_number))
-            elif isinstance(scene_expansions, list) and chapter_number <= len(
-                scene_expansions
-            ):
-                scene_data = scene_expansions[chapter_number - 1]
+            scene_data = _find_scene_for_chapter(scene_expansions, chapter_number)
 
             if not scene_data:
                 yield f"data: {json.dumps({'error': f'Chapter {chapter_number} not found in scene expansions'})}\n\n"
@@ -838,34 +831,13 @@ async def generate_chapter_stream(
             # Generate the chapter using workflow
             workflow = SnowflakeWorkflow()
 
-            # Clear any chapters after this one if regenerating
-            chapters_data = story.data.get("chapters", {})
-            if str(chapter_number) in chapters_data:
-                # This is a regeneration - clear all chapters after this one
-                chapters_to_remove = [
-                    str(i) for i in range(chapter_number + 1, 20)
-                ]  # Assuming max 20 chapters
-                for ch_num in chapters_to_remove:
-                    if ch_num in chapters_data:
-                        del chapters_data[ch_num]
-                story.data["chapters"] = chapters_data
-
-            # Get previous chapters for context (if any)
-            previous_chapters = []
-            previous_chapter_content = None
-
-            for i in range(1, chapter_number):
-                if str(i) in chapters_data:
-                    ch_data = chapters_data[str(i)]
-                    previous_chapters.append(
-                        {"chapter_number": i, "summary": ch_data.get("summary", "")}
-                    )
-                    # Get the most recent chapter's full content for style matching
-                    if i == chapter_number - 1:
-                        previous_chapter_content = ch_data.get("content", "")
+            # Clear later chapters if regenerating and gather previous-chapter context
+            previous_chapters, previous_chapter_content = _prepare_chapter_context(
+                story, chapter_number
+            )
 
             # Generate the chapter prose with streaming
-            full_content = ""
+            chunks = []
             async for chunk in workflow.writer_agent.generate_stream(
                 story_context=story.get_story_context(up_to_step=9),
                 scene_data=scene_data,
@@ -874,24 +846,14 @@ async def generate_chapter_stream(
                 writing_style=writing_style,
                 previous_chapter_content=previous_chapter_content,
             ):
-                full_content += chunk
+                chunks.append(chunk)
                 # Send each chunk as SSE
                 yield f"data: {json.dumps({'type': 'content', 'content': chunk})}\n\n"
 
-            # Count words
-            word_count = len(full_content.split())
+            full_content = "".join(chunks)
 
             # Store the generated chapter
-            if "chapters" not in story.data:
-                story.data["chapters"] = {}
-
-            story.data["chapters"][str(chapter_number)] = {
-                "content": full_content,
-                "word_count": word_count,
-                "generated_at": datetime.now().isoformat(),
-                "scene_title": scene_data.get("title", f"Chapter {chapter_number}"),
-                "summary": f"Chapter {chapter_number}: {scene_data.get('title', '')} - {scene_data.get('scene_goal', '')[:100]}...",
-            }
+            word_count = _store_chapter(story, chapter_number, scene_data, full_content)
 
             await storage.save_story(story)
 
@@ -930,27 +892,14 @@ async def generate_chapter(
 
         # Parse scene expansions
         try:
-            scene_expansions = json.loads(scene_expansions_json)
+            scene_expansions = story.get_step_json(9)
         except json.JSONDecodeError:
             raise HTTPException(
                 status_code=400, detail="Invalid scene expansions format"
             )
 
         # Find the scene for this chapter
-        scene_data = None
-        if isinstance(scene_expansions, dict):
-            # Try to find by scene number
-            for key, scene in scene_expansions.items():
-                if scene.get("scene_number") == chapter_number:
-                    scene_data = scene
-                    break
-            # If not found by scene_number, try by key
-            if not scene_data:
-                scene_data = scene_expansions.get(str(chapter_number))
-        elif isinstance(scene_expansions, list) and chapter_number <= len(
-            scene_expansions
-        ):
-            scene_data = scene_expansions[chapter_number - 1]
+        scene_data = _find_scene_for_chapter(scene_expansions, chapter_number)
 
         if not scene_data:
             raise HTTPException(
@@ -961,31 +910,10 @@ async def generate_chapter(
         # Generate the chapter using workflow
         workflow = SnowflakeWorkflow()
 
-        # Clear any chapters after this one if regenerating
-        chapters_data = story.data.get("chapters", {})
-        if str(chapter_number) in chapters_data:
-            # This is a regeneration - clear all chapters after this one
-            chapters_to_remove = [
-                str(i) for i in range(chapter_number + 1, 20)
-            ]  # Assuming max 20 chapters
-            for ch_num in chapters_to_remove:
-                if ch_num in chapters_data:
-                    del chapters_data[ch_num]
-            story.data["chapters"] = chapters_data
-
-        # Get previous chapters for context (if any)
-        previous_chapters = []
-        previous_chapter_content = None
-
-        for i in range(1, chapter_number):
-            if str(i) in chapters_data:
-                ch_data = chapters_data[str(i)]
-                previous_chapters.append(
-                    {"chapter_number": i, "summary": ch_data.get("summary", "")}
-                )
-                # Get the most recent chapter's full content for style matching
-                if i == chapter_number - 1:
-                    previous_chapter_content = ch_data.get("content", "")
+        # Clear later chapters if regenerating and gather previous-chapter context
+        previous_chapters, previous_chapter_content = _prepare_chapter_context(
+            story, chapter_number
+        )
 
         # Generate the chapter prose
         chapter_content = workflow.generate_chapter_prose(
@@ -997,20 +925,8 @@ async def generate_chapter(
             previous_chapter_content=previous_chapter_content,
         )
 
-        # Count words
-        word_count = len(chapter_content.split())
-
         # Store the generated chapter
-        if "chapters" not in story.data:
-            story.data["chapters"] = {}
-
-        story.data["chapters"][str(chapter_number)] = {
-            "content": chapter_content,
-            "word_count": word_count,
-            "generated_at": datetime.now().isoformat(),
-            "scene_title": scene_data.get("title", f"Chapter {chapter_number}"),
-            "summary": f"Chapter {chapter_number}: {scene_data.get('title', '')} - {scene_data.get('scene_goal', '')[:100]}...",
-        }
+        word_count = _store_chapter(story, chapter_number, scene_data, chapter_content)
 
         await storage.save_story(story)
 
@@ -1081,24 +997,13 @@ async def refine_chapter_stream(
                 return
 
             try:
-                scene_expansions = json.loads(scene_expansions_json)
+                scene_expansions = story.get_step_json(9)
             except json.JSONDecodeError:
                 yield f"data: {json.dumps({'error': 'Invalid scene expansions format'})}\n\n"
                 return
 
             # Find the scene data for this chapter
-            scene_data = None
-            if isinstance(scene_expansions, dict):
-                for key, scene in scene_expansions.items():
-                    if scene.get("scene_number") == chapter_number:
-                        scene_data = scene
-                        break
-                if not scene_data:
-                    scene_data = scene_expansions.get(str(chapter_number))
-            elif isinstance(scene_expansions, list) and chapter_number <= len(
-                scene_expansions
-            ):
-                scene_data = scene_expansions[chapter_number - 1]
+            scene_data = _find_scene_for_chapter(scene_expansions, chapter_number)
 
             if not scene_data:
                 yield f"data: {json.dumps({'error': f'Scene data for Chapter {chapter_number} not found'})}\n\n"
@@ -1109,7 +1014,7 @@ async def refine_chapter_stream(
 
             # Refine the chapter using workflow with streaming
             workflow = SnowflakeWorkflow()
-            full_content = ""
+            chunks = []
             async for chunk in workflow.writer_agent.refine_stream(
                 story_context=story.get_story_context(up_to_step=9),
                 chapter_number=chapter_number,
@@ -1117,10 +1022,12 @@ async def refine_chapter_stream(
                 scene_data=scene_data,
                 instructions=instructions,
             ):
-                full_content += chunk
+                chunks.append(chunk)
                 # Send each chunk as SSE
                 yield f"data: {json.dumps({'type': 'content', 'content': chunk})}\n\n"
 
+            full_content = "".join(chunks)
+
             # Count words
             word_count = len(full_content.split())
 
@@ -1205,25 +1112,14 @@ async def refine_chapter(
             )
 
         try:
-            scene_expansions = json.loads(scene_expansions_json)
+            scene_expansions = story.get_step_json(9)
         except json.JSONDecodeError:
             raise HTTPException(
                 status_code=400, detail="Invalid scene expansions format"
             )
 
         # Find the scene data for this chapter
-        scene_data = None
-        if isinstance(scene_expansions, dict):
-            for key, scene in scene_expansions.items():
-                if scene.get("scene_number") == chapter_number:
-                    scene_data = scene
-                    break
-            if not scene_data:
-                scene_data = scene_expansions.get(str(chapter_number))
-        elif isinstance(scene_expansions, list) and chapter_number <= len(
-            scene_expansions
-        ):
-            scene_data = scene_expansions[chapter_number - 1]
+        scene_data = _find_scene_for_chapter(scene_expansions, chapter_number)
 
         if not scene_data:
             raise HTTPException(
@@ -1267,6 +1163,35 @@ async def refine_chapter(
         raise HTTPException(status_code=404, detail="Story not found")
 
 
+# Divider lines used in the exported novel text
+_NOVEL_RULE = "=" * 50
+_CHAPTER_RULE = "-" * 50
+
+
+def _iter_novel_text(slug: str, chapters_data: Dict[str, Any]):
+    """Yield the pieces of the exported novel text, in order."""
+    yield f"{slug.upper()}\n\n"
+    yield "Created with the Snowflake Method\n"
+    yield f"{_NOVEL_RULE}\n\n"
+
+    # Add each chapter in order
+    for chapter_num in sorted(int(num) for num in chapters_data):
+        chapter_data = chapters_data[str(chapter_num)]
+        title = chapter_data.get("scene_title", f"Chapter {chapter_num}")
+
+        yield f"\n\nCHAPTER {chapter_num}: {title}\n"
+        yield f"{_CHAPTER_RULE}\n\n"
+        yield chapter_data.get("content", "")
+        yield "\n\n"
+
+    # Add metadata at the end
+    total_words = sum(ch.get("word_count", 0) for ch in chapters_data.values())
+    yield f"\n\n{_NOVEL_RULE}\n"
+    yield f"Total word count: {total_words:,}\n"
+    yield f"Chapters: {len(chapters_data)}\n"
+    yield f"Generated on: {datetime.now().strftime('%B %d, %Y')}\n"
+
+
 @app.get("/api/stories/{story_id}/export_novel")
 async def export_novel(story_id: str, session: AsyncSession = Depends(get_db)):
     """Export the generated novel as a text file."""
@@ -1281,28 +1206,7 @@ async def export_novel(story_id: str, session: AsyncSession = Depends(get_db)):
             )
 
         # Compile all chapters into a single document
-        novel_content = f"{story.slug.upper()}\n\n"
-        novel_content += "Created with the Snowflake Method\n"
-        novel_content += f"{'=' * 50}\n\n"
-
-        # Add each chapter in order
-        chapter_numbers = sorted([int(num) for num in chapters_data.keys()])
-        for chapter_num in chapter_numbers:
-            chapter_data = chapters_data[str(chapter_num)]
-            title = chapter_data.get("scene_title", f"Chapter {chapter_num}")
-            content = chapter_data.get("content", "")
-
-            novel_content += f"\n\nCHAPTER {chapter_num}: {title}\n"
-            novel_content += f"{'-' * 50}\n\n"
-            novel_content += content
-            novel_content += "\n\n"
-
-        # Add metadata at the end
-        total_words = sum(ch.get("word_count", 0) for ch in chapters_data.values())
-        novel_content += f"\n\n{'=' * 50}\n"
-        novel_content += f"Total word count: {total_words:,}\n"
-        novel_content += f"Chapters: {len(chapters_data)}\n"
-        novel_content += f"Generated on: {datetime.now().strftime('%B %d, %Y')}\n"
+        novel_content = "".join(_iter_novel_text(story.slug, chapters_data))
 
         # Create filename
         safe_slug = story.slug.replace(" ", "_").replace("/", "_")
@@ -1331,14 +1235,7 @@ async def advance_story(story_id: str, session: AsyncSession = Depends(get_db)):
             story.data["current_step"] = new_step
             await storage.save_story(story)
 
-        return StoryDetailResponse(
-            story_id=story.story_id,
-            slug=story.slug,
-            story_idea=story.data.get("story_idea", ""),
-            current_step=story.get_current_step(),
-            created_at=story.data.get("created_at"),
-            steps={str(k): v for k, v in story.data.get("steps", {}).items()},
-        )
+        return _story_detail(story)
     except StoryNotFoundError:
         raise HTTPException(status_code=404, detail="Story not found")
 
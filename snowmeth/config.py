@@ -3,7 +3,7 @@
 import json
 import os
 from pathlib import Path
-from typing import Dict
+from typing import Any, Dict, Optional, Tuple
 
 try:
     from dotenv import load_dotenv
@@ -14,6 +14,10 @@ except ImportError:
 
 from .exceptions import ModelError
 
+# DSPy LM instances by (model, API key, max_tokens); a new or rotated key
+# builds a fresh LM instead of reusing one bound to the old key
+_lm_cache: Dict[Tuple[str, Optional[str], int], Any] = {}
+
 
 class LLMConfig:
     """
@@ -106,9 +110,14 @@ class LLMConfig:
         # Determine max_tokens based on model capabilities
         max_tokens = self._get_max_tokens_for_model(model)
 
+        # Reuse the LM built for this model with the same key and token limit
+        cache_key = (model, os.getenv(self.get_api_key_env(model)), max_tokens)
+        if cache_key in _lm_cache:
+            return _lm_cache[cache_key]
+
         # Create LM based on model prefix
         if model.startswith("openrouter/"):
-            return dspy.LM(
+            lm = dspy.LM(
                 model=model,
                 api_base="https://openrouter.ai/api/v1",
                 api_key=os.getenv("OPENROUTER_API_KEY"),
@@ -118,7 +127,10 @@ class LLMConfig:
             )
         else:
             # Default DSPy behavior (works for OpenAI, Anthropic, etc.)
-            return dspy.LM(model, temperature=0.9, max_tokens=max_tokens, cache=False)
+            lm = dspy.LM(model, temperature=0.9, max_tokens=max_tokens, cache=False)
+
+        _lm_cache[cache_key] = lm
+        return lm
 
     def _get_max_tokens_for_model(self, model: str) -> int:
         """Get appropriate max_tokens for the model based on its context window"""
@@ -0,0 +1,43 @@
+"""JSON helpers for parsing LLM-generated step content."""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # orjson is optional
+
+# Shared stdlib decoder, skipping json.loads' per-call argument handling
+_decode = json.JSONDecoder().decode
+
+
+def loads(content: str) -> Any:
+    """Parse JSON text, using orjson when it is installed.
+
+    Raises json.JSONDecodeError on invalid input with either parser.
+    """
+    if orjson is not None:
+        return orjson.loads(content)
+    return _decode(content)
+
+
+def dumps_indented(data: Any) -> bytes:
+    """Serialize data as 2-space indented UTF-8 JSON, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def strip_json_fence(content: str) -> str:
+    """Remove the markdown code fence LLMs sometimes wrap around JSON.
+
+    Either side of the fence may be missing; an opening fence may be plain
+    ``` or ```json.
+    """
+    content = content.strip()
+    if content.startswith("```json"):
+        content = content.removeprefix("```json")
+    else:
+        content = content.removeprefix("```")
+    return content.removesuffix("```").strip()
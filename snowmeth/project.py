@@ -18,22 +18,14 @@ class ProjectManager:
         self.storage = storage or FileStorage()
         self.context = context or CLIContext()
 
-        # Set up save callback for stories
-        self._setup_story_save_callback()
-
-    def _setup_story_save_callback(self) -> None:
-        """Set up the save callback for Story instances."""
-
-        # Monkey patch the Story.save method to use our storage
-        def story_save(story_instance):
-            self.storage.save_story(story_instance)
-
-        # This will affect all Story instances created through this manager
-        Story.save = story_save
+    def _bind_story(self, story: Story) -> Story:
+        """Make story.save() persist through this manager's storage."""
+        story._save_backend = self.storage.save_story
+        return story
 
     def create_story(self, slug: str, story_idea: str) -> Story:
         """Create a new story."""
-        story = self.storage.create_story(slug, story_idea)
+        story = self._bind_story(self.storage.create_story(slug, story_idea))
 
         # Set as current story in CLI mode
         if isinstance(self.context, CLIContext):
@@ -43,7 +35,7 @@ class ProjectManager:
 
     def get_story(self, identifier: str) -> Story:
         """Get a story by slug or UUID."""
-        return self.storage.load_story(identifier)
+        return self._bind_story(self.storage.load_story(identifier))
 
     def get_current_story(self) -> Optional[Story]:
         """Get the current active story (CLI mode) or context story (Web mode)."""
@@ -52,7 +44,7 @@ class ProjectManager:
             return None
 
         try:
-            return self.storage.load_story(identifier)
+            return self._bind_story(self.storage.load_story(identifier))
         except StoryNotFoundError:
             # Clear invalid reference
             self.context.clear_current_story()
@@ -68,7 +60,7 @@ class ProjectManager:
 
     def list_stories(self) -> List[Story]:
         """List all stories."""
-        return self.storage.list_stories()
+        return [self._bind_story(story) for story in self.storage.list_stories()]
 
     def delete_story(self, identifier: str) -> None:
         """Delete a story."""
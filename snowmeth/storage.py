@@ -1,13 +1,20 @@
 """Storage abstraction layer for Snowflake Method stories."""
 
 import json
+import os
+import re
 import uuid
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
+from . import json_utils
 from .exceptions import StoryNotFoundError, StoryAlreadyExistsError
 
+# Slug sanitizing patterns, compiled once rather than on every lookup
+_SLUG_INVALID_CHARS = re.compile(r"[^a-zA-Z0-9\-_]")
+_SLUG_REPEATED_HYPHENS = re.compile(r"-+")
+
 
 class StorageBackend(ABC):
     """Abstract base class for story storage backends."""
@@ -53,17 +60,18 @@ class FileStorage(StorageBackend):
         self.snowmeth_dir = self.project_dir / ".snowmeth"
         self.stories_dir = self.snowmeth_dir / "stories"
 
+        # story_id -> (file path, mtime when read), built lazily on UUID lookup
+        self._uuid_paths: Optional[Dict[str, Tuple[Path, float]]] = None
+
         # Ensure directories exist
         self.stories_dir.mkdir(parents=True, exist_ok=True)
 
     def _sanitize_slug(self, slug: str) -> str:
         """Convert slug to safe filename."""
-        import re
-
         # Replace spaces and special chars with hyphens, lowercase
-        sanitized = re.sub(r"[^a-zA-Z0-9\-_]", "-", slug.lower())
+        sanitized = _SLUG_INVALID_CHARS.sub("-", slug.lower())
         # Remove multiple consecutive hyphens
-        sanitized = re.sub(r"-+", "-", sanitized)
+        sanitized = _SLUG_REPEATED_HYPHENS.sub("-", sanitized)
         # Remove leading/trailing hyphens
         return sanitized.strip("-")
 
@@ -72,31 +80,86 @@ class FileStorage(StorageBackend):
         clean_slug = self._sanitize_slug(slug)
         return self.stories_dir / f"{clean_slug}.json"
 
+    def _iter_story_files(self) -> Iterator[Path]:
+        """Yield the story JSON files in the stories directory."""
+        # scandir filters on the entry name without building a Path per entry
+        with os.scandir(self.stories_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".json"):
+                    yield Path(entry.path)
+
     def _load_story_from_file(self, file_path: Path) -> "Story":
         """Load story from a file path."""
-        with open(file_path, "r") as f:
-            story_data = json.load(f)
+        with open(file_path, "r", encoding="utf-8") as f:
+            story_data = json_utils.loads(f.read())
 
-        # Ensure story has UUID
-        if "story_id" not in story_data:
-            story_data["story_id"] = str(uuid.uuid4())
-            # Save back with UUID
-            with open(file_path, "w") as f:
-                json.dump(story_data, f, indent=2)
+        # Story assigns a UUID to legacy files that lack one; persist it
+        missing_id = "story_id" not in story_data
+        story = Story(story_data, file_path)
+        if missing_id:
+            self._write_json_file(file_path, story.data)
+
+        return story
+
+    def _write_json_file(self, file_path: Path, data: Any) -> None:
+        """Write JSON data in one shot, replacing the file atomically."""
+        tmp_path = file_path.with_suffix(".json.tmp")
+        tmp_path.write_bytes(json_utils.dumps_indented(data))
+        os.replace(tmp_path, file_path)
 
-        return Story(story_data, file_path)
+    def _scan_uuid_paths(self) -> Dict[str, Tuple[Path, float]]:
+        """Map every story's UUID to its file by reading the stories directory."""
+        uuid_paths = {}
+        for story_file in self._iter_story_files():
+            try:
+                mtime = story_file.stat().st_mtime
+                with open(story_file, "r", encoding="utf-8") as f:
+                    data = json_utils.loads(f.read())
+            except (json.JSONDecodeError, IOError):
+                continue
+            if isinstance(data, dict) and data.get("story_id"):
+                uuid_paths[data["story_id"]] = (story_file, mtime)
+        return uuid_paths
+
+    def _remember_uuid_path(self, story_id: str, story_file: Path) -> None:
+        """Keep the UUID map in step with a story this instance just saved."""
+        if self._uuid_paths is not None:
+            self._uuid_paths[story_id] = (story_file, story_file.stat().st_mtime)
+
+    def _forget_uuid_path(self, story_file: Path) -> None:
+        """Drop a deleted story file from the UUID map."""
+        if self._uuid_paths is not None:
+            self._uuid_paths = {
+                story_id: cached
+                for story_id, cached in self._uuid_paths.items()
+                if cached[0] != story_file
+            }
 
     def _find_story_by_uuid(self, story_id: str) -> Optional[Path]:
         """Find story file by UUID."""
-        for story_file in self.stories_dir.glob("*.json"):
+        cached = self._uuid_paths.get(story_id) if self._uuid_paths else None
+        if cached is not None:
+            story_file, mtime = cached
             try:
-                with open(story_file, "r") as f:
-                    data = json.load(f)
-                if data.get("story_id") == story_id:
+                if story_file.stat().st_mtime == mtime:
                     return story_file
-            except (json.JSONDecodeError, IOError):
-                continue
-        return None
+            except OSError:
+                pass
+
+        # Stories may have been added, replaced or removed by another process
+        self._uuid_paths = self._scan_uuid_paths()
+        cached = self._uuid_paths.get(story_id)
+        return cached[0] if cached else None
+
+    def _resolve_path(self, identifier: str) -> Optional[Path]:
+        """Find a story's file by slug or UUID without reading it."""
+        # Try the slug first
+        story_file = self._get_story_file_path(identifier)
+        if story_file.exists():
+            return story_file
+
+        # Then the UUID
+        return self._find_story_by_uuid(identifier)
 
     def create_story(
         self, slug: str, story_idea: str, story_id: Optional[str] = None
@@ -123,13 +186,7 @@ class FileStorage(StorageBackend):
 
     def load_story(self, identifier: str) -> "Story":
         """Load a story by slug or UUID."""
-        # Try loading by slug first
-        story_file = self._get_story_file_path(identifier)
-        if story_file.exists():
-            return self._load_story_from_file(story_file)
-
-        # Try loading by UUID
-        story_file = self._find_story_by_uuid(identifier)
+        story_file = self._resolve_path(identifier)
         if story_file:
             return self._load_story_from_file(story_file)
 
@@ -141,13 +198,13 @@ class FileStorage(StorageBackend):
             # Create new file path based on slug
             story.file_path = self._get_story_file_path(story.data["slug"])
 
-        with open(story.file_path, "w") as f:
-            json.dump(story.data, f, indent=2)
+        self._write_json_file(story.file_path, story.data)
+        self._remember_uuid_path(story.story_id, story.file_path)
 
     def list_stories(self) -> List["Story"]:
         """List all stories."""
         stories = []
-        for story_file in self.stories_dir.glob("*.json"):
+        for story_file in self._iter_story_files():
             try:
                 story = self._load_story_from_file(story_file)
                 stories.append(story)
@@ -159,17 +216,16 @@ class FileStorage(StorageBackend):
 
     def delete_story(self, identifier: str) -> None:
         """Delete a story by slug or UUID."""
-        story = self.load_story(identifier)  # This will raise if not found
-        if story.file_path and story.file_path.exists():
-            story.file_path.unlink()
+        story_file = self._resolve_path(identifier)
+        if story_file is None:
+            raise StoryNotFoundError(f"Story '{identifier}' not found")
+
+        story_file.unlink()
+        self._forget_uuid_path(story_file)
 
     def story_exists(self, identifier: str) -> bool:
         """Check if a story exists by slug or UUID."""
-        try:
-            self.load_story(identifier)
-            return True
-        except StoryNotFoundError:
-            return False
+        return self._resolve_path(identifier) is not None
 
     def _get_timestamp(self) -> str:
         """Get current timestamp in ISO format."""
@@ -181,10 +237,28 @@ class FileStorage(StorageBackend):
 class Story:
     """Represents a Snowflake Method story with UUID support."""
 
+    __slots__ = (
+        "_context_cache",
+        "_parse_cache",
+        "_save_backend",
+        "data",
+        "file_path",
+    )
+
     def __init__(self, data: Dict[str, Any], file_path: Optional[Path] = None):
         self.data = data
         self.file_path = file_path
 
+        # Set by ProjectManager so save() persists through its storage backend
+        self._save_backend: Optional[Callable[["Story"], None]] = None
+
+        # Parsed JSON per step, keyed by step number and holding the source
+        # string so a replaced step is re-parsed on the next access
+        self._parse_cache: Dict[int, Tuple[str, Any]] = {}
+
+        # Built context per up_to_step, with the strings it was built from
+        self._context_cache: Dict[int, Tuple[Tuple[Any, ...], str]] = {}
+
         # Ensure story has UUID
         if "story_id" not in self.data:
             self.data["story_id"] = str(uuid.uuid4())
@@ -206,21 +280,7 @@ class Story:
             return self.data["current_step"]
 
         # Otherwise, calculate from highest step with content
-        steps = self.data.get("steps", {})
-        if not steps:
-            return 1
-
-        # Find the highest step number that has content
-        max_step = 1
-        for step_str in steps.keys():
-            try:
-                step_num = int(step_str)
-                if self.get_step_content(step_num) is not None:
-                    max_step = max(max_step, step_num)
-            except ValueError:
-                continue
-
-        return max_step
+        return max([1, *self.get_all_step_content()])
 
     def set_current_step(self, step: int) -> None:
         """Set the current step number."""
@@ -242,6 +302,49 @@ class Story:
 
         return None
 
+    def get_all_step_content(self) -> Dict[int, Any]:
+        """Get the content of every numbered step in one pass over the steps.
+
+        Matches get_step_content: only canonical keys ("5", not "05") count,
+        and steps without content are left out.
+        """
+        contents = {}
+        for step_str, step_data in self.data.get("steps", {}).items():
+            # Handle legacy format where steps were objects with 'content' field
+            if isinstance(step_data, dict) and "content" in step_data:
+                step_data = step_data["content"]
+            elif not isinstance(step_data, str):
+                continue
+            if step_data is None:
+                continue
+
+            try:
+                step = int(step_str)
+            except ValueError:
+                continue
+            if str(step) == step_str:
+                contents[step] = step_data
+        return contents
+
+    def get_step_json(self, step: int) -> Any:
+        """Get the parsed JSON content for a step, or None if the step is empty.
+
+        Results are memoized per step content, so callers must treat the
+        returned object as read-only. Raises json.JSONDecodeError if the step
+        does not hold valid JSON.
+        """
+        content = self.get_step_content(step)
+        if content is None:
+            return None
+
+        cached = self._parse_cache.get(step)
+        if cached is not None and cached[0] is content:
+            return cached[1]
+
+        parsed = json_utils.loads(json_utils.strip_json_fence(content))
+        self._parse_cache[step] = (content, parsed)
+        return parsed
+
     def set_step_content(self, step: int, content: str) -> None:
         """Set content for a specific step."""
         if "steps" not in self.data:
@@ -262,18 +365,35 @@ class Story:
         return self.get_step_content(previous_step) is not None
 
     def get_story_context(self, up_to_step: int) -> str:
-        """Get story context up to a specific step."""
-        context_parts = [f"Story Idea: {self.data.get('story_idea', '')}"]
-
-        for step in range(1, up_to_step + 1):
-            content = self.get_step_content(step)
+        """Get story context up to a specific step.
+
+        The result is reused while the story idea and step contents are the
+        same string objects it was built from, since callers also edit
+        story.data directly.
+        """
+        contents = self.get_all_step_content()
+        sources = (
+            self.data.get("story_idea", ""),
+            *(contents.get(step) for step in range(1, up_to_step + 1)),
+        )
+
+        cached = self._context_cache.get(up_to_step)
+        if cached is not None and all(
+            old is new for old, new in zip(cached[0], sources, strict=True)
+        ):
+            return cached[1]
+
+        context_parts = [f"Story Idea: {sources[0]}"]
+        for step, content in enumerate(sources[1:], 1):
             if content:
                 context_parts.append(f"Step {step}: {content}")
 
-        return "\n\n".join(context_parts)
+        context = "\n\n".join(context_parts)
+        self._context_cache[up_to_step] = (sources, context)
+        return context
 
     def save(self) -> None:
         """Save the story (requires storage backend)."""
-        # This will be called by the storage backend
-        # For now, this is a placeholder that gets overridden by ProjectManager
-        pass
+        # Stories not obtained through a ProjectManager have no backend bound
+        if self._save_backend is not None:
+            self._save_backend(self)
@@ -1,9 +1,12 @@
 """Snowflake Method workflow and progression logic."""
 
-from typing import Optional, Tuple, List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple, List, Dict, Any, Callable
 import json
+import re
 import dspy
 
+from . import json_utils
 from .config import LLMConfig
 from .agents.sentence_summary import SentenceSummaryAgent
 from .agents.paragraph_expansion import ParagraphExpansionAgent
@@ -16,9 +19,87 @@ from .agents.scene_breakdown import SceneBreakdownAgent
 from .agents.scene_expansion import SceneExpansionAgent
 from .agents.story_analyzer import StoryAnalyzerAgent
 from .agents.chapter_writer import ChapterWriterAgent
-from .agents.shared_models import ContentRefiner, clean_json_markdown
+from .agents.shared_models import ContentRefiner
 from .project import Story
 
+# Map step numbers to the content types used when refining
+STEP_CONTENT_TYPES = {
+    1: "sentence",
+    2: "paragraph",
+    3: "character",
+    4: "plot",
+    5: "character_synopsis",
+    6: "detailed_plot",
+    7: "character_chart",
+    8: "scene_breakdown",
+    9: "scene_expansion",
+    10: "story_completion",
+}
+
+# Step advancement from each current step: (SnowflakeWorkflow method, message,
+# marker). Steps without a method return their marker as the content so the
+# caller can handle them specially.
+STEP_TRANSITIONS = {
+    1: ("expand_to_paragraph", "Generated paragraph expansion", None),
+    2: ("extract_characters", "Generated character summaries", None),
+    3: ("expand_to_plot", "Generated plot summary", None),
+    4: ("generate_character_synopses", "Generated character synopses", None),
+    5: ("expand_to_detailed_plot", "Generated detailed plot synopsis", None),
+    # Step 7 generates individual character charts
+    6: (None, "Ready for character chart generation", "INDIVIDUAL_CHARACTERS"),
+    7: ("generate_scene_breakdown", "Generated scene breakdown", None),
+    # Step 9 expands individual scenes
+    8: (None, "Ready for scene expansion", "INDIVIDUAL_SCENES"),
+    # Step 9 is the end of the Snowflake Method; step 10 is "ready for writing"
+    9: (
+        None,
+        "Snowflake Method complete - story ready for revision and writing",
+        "SNOWFLAKE_COMPLETE",
+    ),
+}
+
+# Upper bound on concurrent LLM calls when generating per-item content
+MAX_PARALLEL_LLM_CALLS = 8
+
+# "Scene N" references in analysis recommendations
+_SCENE_REFERENCE = re.compile(r"Scene (\d+)")
+
+# Keywords linking a general recommendation to a scene's themes
+_THEMATIC_KEYWORDS = (
+    "artifact",
+    "magic",
+    "resistance",
+    "defeat",
+    "resolution",
+    "recovery",
+)
+
+
+def _run_in_order(
+    calls: List[Callable[[], Any]],
+) -> List[Tuple[Any, Optional[Exception]]]:
+    """Run independent LLM calls concurrently and return outcomes in call order.
+
+    Each outcome is (result, None) on success or (None, exception) on failure.
+    The calls share the workflow's DSPy modules and the Story, so callers warm
+    the Story and scene index caches first; the workers then only read them.
+    """
+    if not calls:
+        return []
+
+    with ThreadPoolExecutor(
+        max_workers=min(MAX_PARALLEL_LLM_CALLS, len(calls))
+    ) as executor:
+        futures = [executor.submit(call) for call in calls]
+
+    outcomes = []
+    for future in futures:
+        try:
+            outcomes.append((future.result(), None))
+        except Exception as e:
+            outcomes.append((None, e))
+    return outcomes
+
 
 class SnowflakeWorkflow:
     """Handles step progression and AI interactions for the Snowflake Method"""
@@ -46,6 +127,9 @@ class SnowflakeWorkflow:
         # For content refinement
         self.refiner = dspy.ChainOfThought(ContentRefiner)
 
+        # Step 8 scenes by number, with the step content they were built from
+        self._scene_index: Optional[Tuple[str, Dict[int, dict]]] = None
+
     def can_advance(self, story: Story, to_step: int) -> bool:
         """Check if story can advance to the given step"""
         return story.can_advance_to_step(to_step)
@@ -84,15 +168,12 @@ class SnowflakeWorkflow:
 
     def get_character_names(self, story: Story) -> List[str]:
         """Extract character names from Step 3 character summaries"""
-        characters_content = story.get_step_content(3)
-        if not characters_content:
+        if not story.get_step_content(3):
             raise ValueError("No character summaries found in Step 3")
 
-        # Clean up potential markdown formatting
-        content = clean_json_markdown(characters_content)
-
         try:
-            char_dict = json.loads(content)
+            # Parsed once per Step 3 content and shared by every caller
+            char_dict = story.get_step_json(3)
             return list(char_dict.keys())
         except json.JSONDecodeError as e:
             raise ValueError(f"Invalid JSON format in Step 3 character summaries: {e}")
@@ -110,30 +191,33 @@ class SnowflakeWorkflow:
         return self.breakdown_agent(story_context)
 
     def get_scene_list(self, story: Story) -> List[dict]:
-        """Extract scene list from Step 8 scene breakdown"""
-        scene_content = story.get_step_content(8)
-        if not scene_content:
+        """Extract scene list from Step 8 scene breakdown (treat as read-only)"""
+        if not story.get_step_content(8):
             raise ValueError("No scene breakdown found in Step 8")
 
-        # Clean up potential markdown formatting
-        content = clean_json_markdown(scene_content)
-
         try:
-            scene_list = json.loads(content)
-            return scene_list
+            # Parsed once per Step 8 content and shared by every caller
+            return story.get_step_json(8)
         except json.JSONDecodeError as e:
             raise ValueError(f"Invalid JSON format in Step 8 scene breakdown: {e}")
 
+    def get_scene_index(self, story: Story) -> Dict[int, dict]:
+        """Map scene numbers to Step 8 scenes, reused while Step 8 is unchanged"""
+        scene_content = story.get_step_content(8)
+        if self._scene_index is not None and self._scene_index[0] is scene_content:
+            return self._scene_index[1]
+
+        index = {}
+        for scene in self.get_scene_list(story):
+            # Keep the first scene with a given number, as a linear search would
+            index.setdefault(scene.get("scene_number"), scene)
+
+        self._scene_index = (scene_content, index)
+        return index
+
     def expand_scene(self, story: Story, scene_number: int) -> str:
         """Expand a single scene into detailed mini-outline for Step 9"""
-        scene_list = self.get_scene_list(story)
-
-        # Find the specific scene
-        target_scene = None
-        for scene in scene_list:
-            if scene.get("scene_number") == scene_number:
-                target_scene = scene
-                break
+        target_scene = self.get_scene_index(story).get(scene_number)
 
         if not target_scene:
             raise ValueError(f"Scene {scene_number} not found in scene breakdown")
@@ -147,22 +231,14 @@ class SnowflakeWorkflow:
         self, story: Story, scene_number: int, improvement_guidance: str
     ) -> str:
         """Improve a specific scene with targeted feedback"""
-        scene_list = self.get_scene_list(story)
-
-        # Find the specific scene
-        target_scene = None
-        for scene in scene_list:
-            if scene.get("scene_number") == scene_number:
-                target_scene = scene
-                break
+        target_scene = self.get_scene_index(story).get(scene_number)
 
         if not target_scene:
             raise ValueError(f"Scene {scene_number} not found in scene breakdown")
 
         # Get current scene expansion
-        step9_content = story.get_step_content(9)
-        if step9_content:
-            current_expansions = json.loads(step9_content)
+        current_expansions = story.get_step_json(9)
+        if current_expansions:
             scene_key = f"scene_{scene_number}"
             current_scene = current_expansions.get(scene_key, {})
         else:
@@ -193,21 +269,7 @@ class SnowflakeWorkflow:
         if not current_content:
             raise ValueError(f"No content found for step {current_step}")
 
-        # Map step numbers to content types
-        step_types = {
-            1: "sentence",
-            2: "paragraph",
-            3: "character",
-            4: "plot",
-            5: "character_synopsis",
-            6: "detailed_plot",
-            7: "character_chart",
-            8: "scene_breakdown",
-            9: "scene_expansion",
-            10: "story_completion",
-        }
-
-        content_type = step_types.get(current_step, f"step-{current_step}")
+        content_type = STEP_CONTENT_TYPES.get(current_step, f"step-{current_step}")
         story_context = story.get_story_context(up_to_step=current_step)
 
         result = self.refiner(
@@ -232,16 +294,26 @@ class SnowflakeWorkflow:
             character_charts = {}
             errors = []
 
-            for character_name in character_names:
-                try:
-                    chart = self.generate_detailed_character_chart(
-                        story, character_name
+            # Warm the story context here so the worker threads only read it
+            story.get_story_context(up_to_step=6)
+
+            # Each chart is an independent, latency-bound LLM call, so run them
+            # concurrently and collect the results in character order
+            outcomes = _run_in_order(
+                [
+                    lambda name=character_name: self.generate_detailed_character_chart(
+                        story, name
                     )
-                    character_charts[character_name] = chart
-                except Exception as e:
-                    error_msg = f"Error generating chart for {character_name}: {e}"
+                    for character_name in character_names
+                ]
+            )
+
+            for character_name, (chart, error) in zip(character_names, outcomes):
+                if error is not None:
+                    error_msg = f"Error generating chart for {character_name}: {error}"
                     errors.append(error_msg)
                     continue
+                character_charts[character_name] = chart
 
             success = len(character_charts) > 0
             return success, character_charts, errors
@@ -263,24 +335,40 @@ class SnowflakeWorkflow:
             scene_expansions = {}
             errors = []
 
-            for scene in scene_list:
-                scene_num = scene.get("scene_number")
+            # Warm the shared caches here so the worker threads only read them
+            self.get_scene_index(story)
+            story.get_story_context(up_to_step=8)
+
+            # Expand scenes concurrently (each is an LLM call), then collect the
+            # results in scene order
+            scene_nums = [scene.get("scene_number") for scene in scene_list]
+            outcomes = iter(
+                _run_in_order(
+                    [
+                        lambda num=scene_num: self.expand_scene(story, num)
+                        for scene_num in scene_nums
+                        if scene_num
+                    ]
+                )
+            )
+
+            for scene_num in scene_nums:
                 if not scene_num:
                     errors.append("Scene missing scene_number")
                     continue
 
-                try:
-                    expansion = self.expand_scene(story, scene_num)
-                    # Try to parse as JSON, fallback to string
-                    try:
-                        scene_expansions[f"scene_{scene_num}"] = json.loads(expansion)
-                    except json.JSONDecodeError:
-                        scene_expansions[f"scene_{scene_num}"] = expansion
-                except Exception as e:
-                    error_msg = f"Error expanding Scene {scene_num}: {e}"
+                expansion, error = next(outcomes)
+                if error is not None:
+                    error_msg = f"Error expanding Scene {scene_num}: {error}"
                     errors.append(error_msg)
                     continue
 
+                # Try to parse as JSON, fallback to string
+                try:
+                    scene_expansions[f"scene_{scene_num}"] = json_utils.loads(expansion)
+                except json.JSONDecodeError:
+                    scene_expansions[f"scene_{scene_num}"] = expansion
+
             success = len(scene_expansions) > 0
             return success, scene_expansions, errors
 
@@ -371,46 +459,45 @@ class AnalysisWorkflow:
         self, story: Story, analysis_data: dict
     ) -> List[int]:
         """Extract scene numbers that need improvement from analysis data."""
-        scene_numbers = set()
-
         # Get scenes from scene-specific recommendations
         scene_improvements = analysis_data.get("recommendations", {}).get(
             "scene_improvements", []
         )
-        for improvement in scene_improvements:
-            scene_num = improvement.get("scene_number")
-            if scene_num and isinstance(scene_num, int):
-                scene_numbers.add(scene_num)
+        scene_numbers = {
+            scene_num
+            for improvement in scene_improvements
+            if (scene_num := improvement.get("scene_number"))
+            and isinstance(scene_num, int)
+        }
 
         # If no scene-specific recommendations, look for scene numbers in general issues
         if not scene_numbers:
-            import re
-
             recommendations = analysis_data.get("recommendations", {})
             high_priority = recommendations.get("high_priority", [])
             medium_priority = recommendations.get("medium_priority", [])
 
+            # Collect each scene's POV character once, rather than per issue
+            try:
+                pov_scenes = [
+                    (pov, scene_num)
+                    for scene in self.workflow.get_scene_list(story)
+                    if (pov := scene.get("pov_character", ""))
+                    and (scene_num := scene.get("scene_number"))
+                    and isinstance(scene_num, int)
+                ]
+            except Exception:
+                pov_scenes = []  # Skip if scene list can't be loaded
+
             # Look for "Scene N" patterns in issues
             for issue in high_priority + medium_priority:
-                scene_matches = re.findall(r"Scene (\d+)", issue)
-                for match in scene_matches:
-                    scene_numbers.add(int(match))
+                scene_numbers.update(
+                    int(match) for match in _SCENE_REFERENCE.findall(issue)
+                )
 
                 # Look for character names (POV characters) in issues
-                try:
-                    scene_list = self.workflow.get_scene_list(story)
-                    for scene in scene_list:
-                        pov = scene.get("pov_character", "")
-                        scene_num = scene.get("scene_number")
-                        if (
-                            pov
-                            and pov in issue
-                            and scene_num
-                            and isinstance(scene_num, int)
-                        ):
-                            scene_numbers.add(scene_num)
-                except Exception:
-                    pass  # Skip if scene list can't be loaded
+                scene_numbers.update(
+                    scene_num for pov, scene_num in pov_scenes if pov in issue
+                )
 
         return sorted(list(scene_numbers))
 
@@ -432,48 +519,66 @@ class AnalysisWorkflow:
             return 0, ["No Step 9 content found"]
 
         try:
-            current_expansions = json.loads(step9_content)
+            current_expansions = json_utils.loads(step9_content)
         except json.JSONDecodeError as e:
             return 0, [f"Could not parse Step 9 content: {e}"]
 
-        # Get scene list for context
+        # Get scenes by number for context
         try:
-            scene_list = self.workflow.get_scene_list(story)
+            scene_index = self.workflow.get_scene_index(story)
         except Exception as e:
             return 0, [f"Could not load scene list: {e}"]
 
-        for scene_num in scene_numbers:
-            try:
-                scene_key = f"scene_{scene_num}"
-                if scene_key not in current_expansions:
-                    errors.append(f"Scene {scene_num} not found in expansions")
-                    continue
-
-                # Generate improvement guidance for this scene
-                improvement_guidance = self._generate_improvement_guidance(
-                    scene_num, scene_list, analysis_data
-                )
+        def improve(scene_num: int) -> str:
+            # Generate improvement guidance for this scene, then improve it
+            improvement_guidance = self._generate_improvement_guidance(
+                scene_num, scene_index, analysis_data
+            )
+            return self.workflow.improve_scene(story, scene_num, improvement_guidance)
+
+        # Warm the shared caches here so the worker threads only read them
+        story.get_step_json(9)
+        story.get_story_context(up_to_step=8)
+
+        # Improve scenes concurrently (each is an LLM call), then merge the
+        # results in the requested order
+        found = [
+            f"scene_{scene_num}" in current_expansions for scene_num in scene_numbers
+        ]
+        outcomes = iter(
+            _run_in_order(
+                [
+                    lambda num=scene_num: improve(num)
+                    for scene_num, is_found in zip(scene_numbers, found)
+                    if is_found
+                ]
+            )
+        )
 
-                # Improve the scene
-                improved_scene = self.workflow.improve_scene(
-                    story, scene_num, improvement_guidance
-                )
+        for scene_num, is_found in zip(scene_numbers, found):
+            if not is_found:
+                errors.append(f"Scene {scene_num} not found in expansions")
+                continue
 
-                # Parse and update
-                try:
-                    improved_scene_data = json.loads(improved_scene)
-                    current_expansions[scene_key] = improved_scene_data
-                    improved_count += 1
-                except json.JSONDecodeError as e:
-                    errors.append(f"Could not parse improved Scene {scene_num}: {e}")
+            improved_scene, error = next(outcomes)
+            if error is not None:
+                errors.append(f"Error improving Scene {scene_num}: {error}")
+                continue
 
-            except Exception as e:
-                errors.append(f"Error improving Scene {scene_num}: {e}")
+            # Parse and update
+            try:
+                improved_scene_data = json_utils.loads(improved_scene)
+                current_expansions[f"scene_{scene_num}"] = improved_scene_data
+                improved_count += 1
+            except json.JSONDecodeError as e:
+                errors.append(f"Could not parse improved Scene {scene_num}: {e}")
 
         # Save updated scenes if any were improved
         if improved_count > 0:
             try:
-                story.set_step_content(9, json.dumps(current_expansions, indent=2))
+                story.set_step_content(
+                    9, json_utils.dumps_indented(current_expansions).decode("utf-8")
+                )
                 story.save()
             except Exception as e:
                 errors.append(f"Error saving improvements: {e}")
@@ -482,16 +587,13 @@ class AnalysisWorkflow:
         return improved_count, errors
 
     def _generate_improvement_guidance(
-        self, scene_num: int, scene_list: List[dict], analysis_data: dict = None
+        self,
+        scene_num: int,
+        scene_index: Dict[int, dict],
+        analysis_data: dict = None,
     ) -> str:
         """Generate specific improvement guidance for a scene."""
-        # Find scene data
-        scene_data = None
-        for scene in scene_list:
-            if scene.get("scene_number") == scene_num:
-                scene_data = scene
-                break
-
+        scene_data = scene_index.get(scene_num)
         if not scene_data:
             return "Enhance character development, emotional depth, and concrete story details"
 
@@ -501,6 +603,12 @@ class AnalysisWorkflow:
         scene_issues = []
         general_issues = []
 
+        # Thematic keywords present in this scene, checked against each issue
+        scene_desc_lower = scene_description.lower()
+        scene_keywords = [
+            keyword for keyword in _THEMATIC_KEYWORDS if keyword in scene_desc_lower
+        ]
+
         if analysis_data:
             recommendations = analysis_data.get("recommendations", {})
             high_priority = recommendations.get("high_priority", [])
@@ -515,20 +623,9 @@ class AnalysisWorkflow:
                 else:
                     # Check if issue relates to scene content/themes
                     issue_lower = issue.lower()
-                    scene_desc_lower = scene_description.lower()
 
                     # Look for thematic connections
-                    if any(
-                        keyword in issue_lower and keyword in scene_desc_lower
-                        for keyword in [
-                            "artifact",
-                            "magic",
-                            "resistance",
-                            "defeat",
-                            "resolution",
-                            "recovery",
-                        ]
-                    ):
+                    if any(keyword in issue_lower for keyword in scene_keywords):
                         general_issues.append(f"THEMATIC: {issue}")
                     elif "internal conflict" in issue_lower and pov:
                         general_issues.append(f"GENERAL: {issue}")
@@ -567,65 +664,21 @@ class StepProgression:
                 None,
             )
 
-        try:
-            if current_step == 1 and next_step == 2:
-                content = self.workflow.expand_to_paragraph(story)
-                return True, "Generated paragraph expansion", content
-
-            elif current_step == 2 and next_step == 3:
-                content = self.workflow.extract_characters(story)
-                return True, "Generated character summaries", content
-
-            elif current_step == 3 and next_step == 4:
-                content = self.workflow.expand_to_plot(story)
-                return True, "Generated plot summary", content
-
-            elif current_step == 4 and next_step == 5:
-                content = self.workflow.generate_character_synopses(story)
-                return True, "Generated character synopses", content
-
-            elif current_step == 5 and next_step == 6:
-                content = self.workflow.expand_to_detailed_plot(story)
-                return True, "Generated detailed plot synopsis", content
-
-            elif current_step == 6 and next_step == 7:
-                # Step 7 is special - we generate individual character charts
-                # Return a special marker to indicate this needs special handling
-                return (
-                    True,
-                    "Ready for character chart generation",
-                    "INDIVIDUAL_CHARACTERS",
-                )
-
-            elif current_step == 7 and next_step == 8:
-                content = self.workflow.generate_scene_breakdown(story)
-                return True, "Generated scene breakdown", content
-
-            elif current_step == 8 and next_step == 9:
-                # Step 9 is special - we expand individual scenes
-                # Return a special marker to indicate this needs special handling
-                return (
-                    True,
-                    "Ready for scene expansion",
-                    "INDIVIDUAL_SCENES",
-                )
-
-            elif current_step == 9 and next_step == 10:
-                # Step 9 is the end of the Snowflake Method
-                # Step 10 represents "ready for writing"
-                return (
-                    True,
-                    "Snowflake Method complete - story ready for revision and writing",
-                    "SNOWFLAKE_COMPLETE",
-                )
+        transition = STEP_TRANSITIONS.get(current_step)
+        if transition is None:
+            return (
+                False,
+                f"Step {current_step} -> {next_step} expansion not yet implemented.",
+                None,
+            )
 
-            else:
-                return (
-                    False,
-                    f"Step {current_step} -> {next_step} expansion not yet implemented.",
-                    None,
-                )
+        method_name, message, marker = transition
+        if method_name is None:
+            return True, message, marker
 
+        try:
+            content = getattr(self.workflow, method_name)(story)
+            return True, message, content
         except Exception as e:
             return False, f"Error generating content: {e}", None
 
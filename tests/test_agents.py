@@ -35,3 +35,9 @@ class TestUtilities:
         input_text = '  ```json  \n  {"test": "value"}  \n  ```  '
         expected = '{"test": "value"}'
         assert clean_json_markdown(input_text) == expected
+
+    def test_clean_json_markdown_plain_fence(self):
+        """Test JSON cleaning handles fences without a language tag."""
+        input_text = '```\n{"test": "value"}\n```'
+        expected = '{"test": "value"}'
+        assert clean_json_markdown(input_text) == expected
@@ -0,0 +1,55 @@
+"""Tests for the JSON helpers, with and without orjson."""
+
+import json
+
+import pytest
+
+from snowmeth import json_utils
+
+STORY_DATA = {
+    "slug": "caf",
+    "story_idea": 'A naïve idea — with "quotes"\nand lines',
+    "current_step": 2,
+    "steps": {"1": "One sentence.", "2": ""},
+    "chapters": {},
+    "tags": [],
+    "writing_style": None,
+}
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def parser(request, monkeypatch):
+    """Run a test against both json_utils branches."""
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(json_utils, "orjson", None)
+    return request.param
+
+
+class TestJsonUtils:
+    """Test json_utils parsing and serialization."""
+
+    def test_loads(self, parser):
+        """Test parsing valid JSON."""
+        assert json_utils.loads('{"a": [1, null, "é"]}') == {"a": [1, None, "é"]}
+
+    def test_loads_invalid_raises_json_decode_error(self, parser):
+        """Test invalid JSON raises json.JSONDecodeError with either parser."""
+        with pytest.raises(json.JSONDecodeError):
+            json_utils.loads("not json")
+
+    def test_dumps_indented_round_trips(self, parser):
+        """Test indented output parses back to the same data."""
+        content = json_utils.dumps_indented(STORY_DATA).decode("utf-8")
+        assert json_utils.loads(content) == STORY_DATA
+
+    def test_dumps_indented_is_identical_across_parsers(self, monkeypatch):
+        """Test orjson and stdlib write byte-identical story files."""
+        pytest.importorskip("orjson")
+        with_orjson = json_utils.dumps_indented(STORY_DATA)
+
+        monkeypatch.setattr(json_utils, "orjson", None)
+        with_stdlib = json_utils.dumps_indented(STORY_DATA)
+
+        assert with_orjson == with_stdlib
@@ -0,0 +1,78 @@
+"""Tests for PDF export."""
+
+import io
+import json
+from datetime import UTC, datetime
+
+import pytest
+
+from snowmeth import pdf_export
+from snowmeth.storage import Story
+
+FIXED_TIME = datetime(2025, 1, 1, 12, 0, tzinfo=UTC)
+
+
+class FrozenDatetime(datetime):
+    """datetime whose now() is fixed, for the "Generated:" date line."""
+
+    @classmethod
+    def now(cls, tz=None):
+        return FIXED_TIME.astimezone(tz) if tz else FIXED_TIME.replace(tzinfo=None)
+
+
+class FixedDatePDF(pdf_export.StoryPDF):
+    """StoryPDF with a fixed creation date in its metadata."""
+
+    def __init__(self):
+        super().__init__()
+        self.set_creation_date(FIXED_TIME)
+
+
+@pytest.fixture
+def frozen_time(monkeypatch):
+    """Freeze the generation date and PDF creation date."""
+    monkeypatch.setattr(pdf_export, "datetime", FrozenDatetime)
+    monkeypatch.setattr(pdf_export, "StoryPDF", FixedDatePDF)
+
+
+@pytest.fixture
+def story():
+    """A story with prose, JSON and Unicode step content."""
+    characters = {"Alice": "A brave ‘hero’ — with flaws."}
+    scenes = [
+        {"scene_number": 1, "pov_character": "Alice", "scene_description": "Begins."}
+    ]
+    return Story(
+        {
+            "story_id": "pdf-id",
+            "slug": "pdf-story",
+            "story_idea": "A story for “export”",
+            "current_step": 8,
+            "steps": {
+                "1": "One sentence.",
+                "2": "One paragraph…",
+                "3": json.dumps(characters),
+                "8": json.dumps(scenes),
+            },
+        }
+    )
+
+
+class TestWriteStoryPdf:
+    """Test writing PDFs to files and streams."""
+
+    def test_write_to_stream_matches_generate(self, frozen_time, story):
+        """Test writing to a binary stream gives the generated bytes."""
+        buffer = io.BytesIO()
+        pdf_export.write_story_pdf(story, buffer)
+
+        expected = pdf_export.generate_story_pdf(story)
+        assert expected.startswith(b"%PDF")
+        assert buffer.getvalue() == expected
+
+    def test_write_to_path_matches_generate(self, frozen_time, story, tmp_path):
+        """Test writing to a file path gives the generated bytes."""
+        pdf_path = tmp_path / "story.pdf"
+        pdf_export.write_story_pdf(story, pdf_path)
+
+        assert pdf_path.read_bytes() == pdf_export.generate_story_pdf(story)
@@ -1,6 +1,42 @@
 """Tests for project/story management."""
 
-from snowmeth.storage import Story
+import json
+
+import pytest
+
+from snowmeth.context import StatelessContext
+from snowmeth.exceptions import StoryNotFoundError
+from snowmeth.project import ProjectManager
+from snowmeth.storage import FileStorage, StorageBackend, Story
+
+
+class MemoryStorage(StorageBackend):
+    """In-memory storage backend, keyed by slug."""
+
+    def __init__(self):
+        self.stories = {}
+
+    def create_story(self, slug, story_idea, story_id=None):
+        story = Story({"slug": slug, "story_idea": story_idea, "steps": {}})
+        self.save_story(story)
+        return story
+
+    def load_story(self, identifier):
+        if identifier not in self.stories:
+            raise StoryNotFoundError(f"Story '{identifier}' not found")
+        return Story(json.loads(self.stories[identifier]))
+
+    def save_story(self, story):
+        self.stories[story.slug] = json.dumps(story.data)
+
+    def list_stories(self):
+        return [self.load_story(slug) for slug in self.stories]
+
+    def delete_story(self, identifier):
+        del self.stories[identifier]
+
+    def story_exists(self, identifier):
+        return identifier in self.stories
 
 
 class TestStory:
@@ -51,3 +87,168 @@ class TestStory:
         assert story.can_advance_to_step(2) is True
         # Should not be able to advance to step 3 without step 2 content
         assert story.can_advance_to_step(3) is False
+
+    def test_get_step_json_is_memoized(self):
+        """Test parsed step JSON is cached until the step content changes."""
+        story = Story(
+            {
+                "slug": "test-story",
+                "current_step": 3,
+                "steps": {"3": '```json\n{"Alice": "The hero"}\n```'},
+            }
+        )
+
+        parsed = story.get_step_json(3)
+        assert parsed == {"Alice": "The hero"}
+        assert story.get_step_json(3) is parsed
+        assert story.get_step_json(4) is None
+
+        story.set_step_content(3, '{"Bob": "The villain"}')
+        assert story.get_step_json(3) == {"Bob": "The villain"}
+
+    def test_get_story_context_is_memoized(self):
+        """Test story context is rebuilt only when its inputs change."""
+        story = Story({"story_idea": "An idea", "steps": {"1": "One line"}})
+
+        context = story.get_story_context(2)
+        assert context == "Story Idea: An idea\n\nStep 1: One line"
+        assert story.get_story_context(2) is context
+
+        # Direct edits to story.data are picked up too
+        story.data["steps"]["2"] = "A paragraph"
+        assert story.get_story_context(2).endswith("Step 2: A paragraph")
+
+    def test_get_all_step_content(self):
+        """Test fetching every step's content in one pass."""
+        story = Story({"steps": {"1": "First.", "2": {"content": "Legacy second."}}})
+
+        assert story.get_all_step_content() == {1: "First.", 2: "Legacy second."}
+        assert story.get_current_step() == 2
+
+    def test_get_all_step_content_matches_get_step_content(self):
+        """Test empty legacy steps and non-canonical keys are ignored."""
+        story = Story(
+            {"steps": {"1": "First.", "5": {"content": None}, "02": "Padded"}}
+        )
+
+        assert story.get_all_step_content() == {1: "First."}
+        assert story.get_current_step() == 1
+        assert "Padded" not in story.get_story_context(5)
+
+    def test_save_without_storage_is_noop(self, tmp_path):
+        """Test a story built directly has no backend, so save() writes nothing."""
+        story = Story({"slug": "loose"}, tmp_path / "loose.json")
+        story.save()
+
+        assert not story.file_path.exists()
+
+
+class TestFileStorage:
+    """Test FileStorage functionality."""
+
+    def test_list_stories_after_save_and_delete(self, tmp_path):
+        """Test list_stories reflects saves and deletes."""
+        storage = FileStorage(str(tmp_path))
+        storage.create_story("first", "First idea")
+        second = storage.create_story("second", "Second idea")
+
+        second.set_step_content(1, "One sentence.")
+        storage.save_story(second)
+
+        stories = storage.list_stories()
+        assert [story.slug for story in stories] == ["first", "second"]
+        assert stories[1].get_step_content(1) == "One sentence."
+
+        storage.delete_story("first")
+        assert [story.slug for story in storage.list_stories()] == ["second"]
+
+    def test_list_stories_sees_external_edit(self, tmp_path):
+        """Test list_stories and UUID lookups see a story file edited on disk."""
+        storage = FileStorage(str(tmp_path))
+        story = storage.create_story("edited", "Original idea", story_id="uuid-1")
+        assert storage.load_story("uuid-1").data["story_idea"] == "Original idea"
+
+        story.data["story_idea"] = "Edited idea"
+        story.file_path.write_text(json.dumps(story.data))
+
+        assert [s.data["story_idea"] for s in storage.list_stories()] == ["Edited idea"]
+        assert storage.load_story("uuid-1").data["story_idea"] == "Edited idea"
+
+    def test_uuid_lookup_tracks_stories(self, tmp_path):
+        """Test UUID lookups follow saves and deletes, including other instances."""
+        storage = FileStorage(str(tmp_path))
+        storage.create_story("My Story", "A test story", story_id="uuid-1")
+
+        assert storage.load_story("uuid-1").slug == "my-story"
+        assert FileStorage(str(tmp_path)).story_exists("uuid-1")
+
+        storage.delete_story("uuid-1")
+        assert not storage.story_exists("uuid-1")
+
+        # Stories saved by another instance are picked up on lookup
+        FileStorage(str(tmp_path)).create_story("Other", "Another", story_id="uuid-2")
+        assert storage.load_story("uuid-2").slug == "other"
+
+    def test_uuid_lookup_ignores_non_object_json(self, tmp_path):
+        """Test stray JSON files in the stories directory don't break lookups."""
+        storage = FileStorage(str(tmp_path))
+        (storage.stories_dir / "stray.json").write_text("[]")
+
+        storage.create_story("real", "A real story", story_id="uuid-1")
+
+        assert storage.story_exists("uuid-1")
+
+    def test_uuid_lookup_sees_story_replaced_by_another_instance(self, tmp_path):
+        """Test a cached UUID path is not reused once its file holds another story."""
+        storage = FileStorage(str(tmp_path))
+        storage.create_story("one", "Original", story_id="old")
+        assert storage.load_story("old").data["story_idea"] == "Original"
+
+        other = FileStorage(str(tmp_path))
+        other.delete_story("one")
+        other.create_story("one", "Replacement", story_id="new")
+
+        assert not storage.story_exists("old")
+        with pytest.raises(StoryNotFoundError):
+            storage.load_story("old")
+        with pytest.raises(StoryNotFoundError):
+            storage.delete_story("old")
+        assert storage.load_story("new").data["story_idea"] == "Replacement"
+
+
+class TestProjectManager:
+    """Test ProjectManager functionality."""
+
+    def test_story_save_uses_manager_storage(self, tmp_path):
+        """Test stories from a manager save through its storage backend."""
+        manager = ProjectManager(FileStorage(str(tmp_path)), StatelessContext())
+        manager.create_story("saved", "A story to save")
+
+        story = manager.get_story("saved")
+        story.set_step_content(1, "One sentence.")
+        story.save()
+
+        assert manager.get_story("saved").get_step_content(1) == "One sentence."
+
+    def test_stories_save_through_their_own_manager(self, tmp_path):
+        """Test managers on different backends don't redirect each other's saves."""
+        file_manager = ProjectManager(FileStorage(str(tmp_path)), StatelessContext())
+        memory_manager = ProjectManager(MemoryStorage(), StatelessContext())
+        file_manager.create_story("on-disk", "A file story")
+        memory_manager.create_story("in-memory", "A memory story")
+
+        file_story = file_manager.get_story("on-disk")
+        memory_story = memory_manager.get_story("in-memory")
+        file_story.set_step_content(1, "Saved to disk.")
+        memory_story.set_step_content(1, "Saved to memory.")
+        file_story.save()
+        memory_story.save()
+
+        assert file_manager.get_story("on-disk").get_step_content(1) == (
+            "Saved to disk."
+        )
+        assert memory_manager.get_story("in-memory").get_step_content(1) == (
+            "Saved to memory."
+        )
+        assert not memory_manager.storage.story_exists("on-disk")
+        assert not file_manager.storage.story_exists("in-memory")
@@ -0,0 +1,126 @@
+"""Tests for the workflow's concurrent LLM fan-outs, with stubbed agents."""
+
+import json
+import time
+
+import pytest
+
+from snowmeth.storage import Story
+from snowmeth.workflow import SnowflakeWorkflow, _run_in_order
+
+
+def slow_call(delay, result):
+    """Build a call that finishes after delay seconds, raising result if it is one."""
+
+    def call():
+        time.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    return call
+
+
+@pytest.fixture
+def workflow(monkeypatch):
+    """A workflow whose LM is never called; tests stub the agents they use."""
+    monkeypatch.delenv("SNOWMETH_DEFAULT_MODEL", raising=False)
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    return SnowflakeWorkflow()
+
+
+class TestRunInOrder:
+    """Test the bounded executor helper."""
+
+    def test_outcomes_follow_call_order(self):
+        """Test results come back in call order, not completion order."""
+        calls = [slow_call(0.03 - 0.01 * i, f"result {i}") for i in range(3)]
+
+        assert _run_in_order(calls) == [
+            ("result 0", None),
+            ("result 1", None),
+            ("result 2", None),
+        ]
+
+    def test_failed_call_keeps_other_results(self):
+        """Test one failure is reported in its slot without dropping the others."""
+        error = ValueError("boom")
+        calls = [
+            slow_call(0.02, "first"),
+            slow_call(0.0, error),
+            slow_call(0.01, "third"),
+        ]
+
+        assert _run_in_order(calls) == [
+            ("first", None),
+            (None, error),
+            ("third", None),
+        ]
+
+    def test_no_calls(self):
+        """Test an empty batch returns no outcomes."""
+        assert _run_in_order([]) == []
+
+
+class TestWorkflowFanOut:
+    """Test the Step 7 and Step 9 fan-outs with stubbed agents."""
+
+    def test_character_charts_order_and_errors(self, workflow):
+        """Test charts keep character order and a failed chart is reported."""
+        steps = {str(step): f"Step {step} content." for step in range(1, 7)}
+        steps["3"] = json.dumps({"Alice": "Hero", "Bob": "Villain", "Cara": "Ally"})
+        story = Story({"story_idea": "An idea", "steps": steps})
+        contexts = []
+
+        def charts_agent(story_context, character_name):
+            contexts.append(story_context)
+            time.sleep({"Alice": 0.03, "Bob": 0.0, "Cara": 0.01}[character_name])
+            if character_name == "Bob":
+                raise RuntimeError("rate limited")
+            return f"Chart for {character_name}"
+
+        workflow.charts_agent = charts_agent
+
+        success, charts, errors = workflow.handle_character_charts_generation(story)
+
+        assert success
+        assert list(charts.items()) == [
+            ("Alice", "Chart for Alice"),
+            ("Cara", "Chart for Cara"),
+        ]
+        assert errors == ["Error generating chart for Bob: rate limited"]
+        # Every worker reused the context built before the fan-out
+        assert all(context is contexts[0] for context in contexts)
+
+    def test_scene_expansions_order_and_errors(self, workflow):
+        """Test expansions keep scene order and failures don't drop other scenes."""
+        scenes = [
+            {"scene_number": 1, "scene_description": "Opening"},
+            {"scene_description": "No number"},
+            {"scene_number": 2, "scene_description": "Middle"},
+            {"scene_number": 3, "scene_description": "Ending"},
+        ]
+        story = Story({"story_idea": "An idea", "steps": {"8": json.dumps(scenes)}})
+
+        def expansion_agent(story_context, scene_info):
+            scene_number = json.loads(scene_info)["scene_number"]
+            time.sleep(0.01 * (3 - scene_number))
+            if scene_number == 2:
+                raise RuntimeError("timed out")
+            if scene_number == 3:
+                return "Plain text expansion"
+            return json.dumps({"title": f"Scene {scene_number}"})
+
+        workflow.expansion_agent = expansion_agent
+
+        success, expansions, errors = workflow.handle_scene_expansions_generation(story)
+
+        assert success
+        assert list(expansions.items()) == [
+            ("scene_1", {"title": "Scene 1"}),
+            ("scene_3", "Plain text expansion"),
+        ]
+        assert errors == [
+            "Scene missing scene_number",
+            "Error expanding Scene 2: timed out",
+        ]